@@ -1,32 +1,98 @@
+import math
+from functools import lru_cache
+
 import numpy as np
 import pandas as pd
 
-def generate_gbm_paths(S0, mu, sigma, T, N, seed=42):
+from data_io import save_frame
+
+def _gbm_euler_loop_py(S0, mu, sigma, dt, Z, out):
+    # The Euler recursion is a running product of per-step growth factors
+    out[0] = S0
+    out[1:] = S0 * np.cumprod(1 + mu * dt + sigma * math.sqrt(dt) * Z)
+    return out
+
+def _gbm_euler_loop(S0, mu, sigma, dt, Z, out):
+    sqrt_dt = math.sqrt(dt)
+    out[0] = S0
+    for i in range(Z.size):
+        out[i + 1] = out[i] * (1 + mu * dt + sigma * sqrt_dt * Z[i])
+    return out
+
+@lru_cache(maxsize=None)
+def _gbm_euler_kernel():
+    # Numba is optional and only imported once the stepwise path is used,
+    # so importers of this module (e.g. Monte Carlo workers) don't pay for it
+    try:
+        from numba import njit
+    except ImportError:
+        return _gbm_euler_loop_py
+    return njit(cache=True, fastmath=True)(_gbm_euler_loop)
+
+def generate_gbm_paths(S0, mu, sigma, T, N, n_paths=1, seed=42, rng=None):
     """
     Generate geometric Brownian motion paths.
+
+    Uses the log-Euler scheme, which is exact for GBM:
+        log S[i+1] = log S[i] + (mu - 0.5 sigma^2) dt + sigma sqrt(dt) Z[i]
+    so a path is one cumsum and one exp, and prices stay strictly positive.
     Args:
         S0: Initial price
         mu: Drift
         sigma: Volatility
         T: Total time (years)
         N: Number of steps
+        n_paths: Number of independent paths
         seed: Random seed
+        rng: np.random.Generator to draw from (overrides seed)
+    Returns:
+        np.array of prices of shape (N+1, n_paths), or length N+1 when n_paths == 1
+    """
+    if rng is None:
+        rng = np.random.default_rng(seed)
+    dt = T / N
+    drift = (mu - 0.5 * sigma ** 2) * dt
+    diff = sigma * np.sqrt(dt)
+    Z = rng.standard_normal((N, n_paths))
+    # Log-Euler step: exact for GBM and keeps prices strictly positive
+    log_incr = drift + diff * Z
+    paths = np.empty((N + 1, n_paths))
+    paths[0] = S0
+    paths[1:] = S0 * np.exp(np.cumsum(log_incr, axis=0))
+    if n_paths == 1:
+        return paths[:, 0]
+    return paths
+
+def _generate_gbm_paths_euler(S0, mu, sigma, T, N, seed=42, rng=None):
+    """
+    Stepwise Euler GBM path, for dynamics that can't use the closed form.
+    The stepping loop is JIT-compiled with Numba when it is installed.
+
+    Discretizes the SDE directly:
+        S[i+1] = S[i] * (1 + mu dt + sigma sqrt(dt) Z[i])
+    which is only first-order accurate and can go negative when
+    sigma sqrt(dt) is large. Kept for comparison with generate_gbm_paths.
     Returns:
         np.array of prices of length N+1
     """
-    np.random.seed(seed)
+    if rng is None:
+        rng = np.random.default_rng(seed)
     dt = T / N
-    prices = [S0]
-    for _ in range(N):
-        Z = np.random.normal()
-        dS = prices[-1] * (mu * dt + sigma * np.sqrt(dt) * Z)
-        prices.append(prices[-1] + dS)
-    return np.array(prices)
-
-def generate_mock_data():
+    Z = rng.standard_normal(N)
+    prices = np.empty(N + 1, dtype=np.float64)
+    return _gbm_euler_kernel()(float(S0), float(mu), float(sigma), float(dt), Z, prices)
+
+def generate_mock_data(seed=42, rng=None, save=True):
     """
     Generate mock spot, futures, rates and dividend forecasts.
-    Saves to data/mock_market_data.csv
+    Saves to data/mock_market_data.<parquet|csv>
+
+    Args:
+        seed: Random seed
+        rng: np.random.Generator shared by every draw (overrides seed)
+        save: Write the data to disk; pass False to keep it in memory only
+    Returns:
+        pd.DataFrame of mock market data
     """
     # Parameters
     S0 = 100.0           # Initial spot price
@@ -38,38 +104,44 @@ def generate_mock_data():
     div_yield_true = 0.015  # True annual dividend yield
     div_noise_std = 0.003    # Dividend forecast noise
 
+    # One generator for the whole dataset so every draw is reproducible
+    if rng is None:
+        rng = np.random.default_rng(seed)
+
     # Generate spot price path (daily steps)
-    spot_prices = generate_gbm_paths(S0, mu, sigma, T_days, N)
+    spot_prices = generate_gbm_paths(S0, mu, sigma, T_days, N, rng=rng)
 
     # Futures price calculation:
     # Futures = Spot * exp((r - q) * T)
     # We'll do futures prices for 1-month and 3-month maturities
     maturities = [20, 60]  # days
-    futures_data = {}
-    for days_to_expiry in maturities:
-        T = days_to_expiry / 252  # Trading year convention
-        # Add noise to dividend forecast
-        div_forecast = div_yield_true + np.random.normal(0, div_noise_std, size=N+1)
-        futures = spot_prices * np.exp((r - div_forecast) * T)
-        futures_data[f'F_{days_to_expiry}d'] = futures
-
-    # Construct DataFrame
+    # Dividend noise for every maturity plus the forecast series, drawn once:
+    # rows 0..M-1 are the dividends priced into each future, the last row
+    # is the forecast we compare against
+    noise = rng.standard_normal((len(maturities) + 1, N + 1)) * div_noise_std
+    div_forecast_series = div_yield_true + noise[-1]
+    # Broadcast over maturities: rows are maturities, columns are days
+    T_arr = np.asarray(maturities) / 252.0  # Trading year convention
+    div_fcst = div_yield_true + noise[:-1]  # (M, N+1)
+    futures = spot_prices[None, :] * np.exp((r - div_fcst) * T_arr[:, None])
+
+    # Construct DataFrame in one go from a single column dict
+    # Compact storage dtypes: prices/rates in float32, day index in int32
     df = pd.DataFrame({
-        'Day': np.arange(N+1),
-        'Spot': spot_prices,
-        'RiskFreeRate': r,
-        'DivTrue': div_yield_true
+        'Day': np.arange(N+1, dtype=np.int32),
+        'Spot': spot_prices.astype(np.float32),
+        'RiskFreeRate': np.full(N+1, r, dtype=np.float32),
+        'DivTrue': np.full(N+1, div_yield_true, dtype=np.float32),
+        **{f'F_{d}d': futures[k].astype(np.float32) for k, d in enumerate(maturities)},
+        # Dividend forecasts time series (with noise)
+        'DivForecast': div_forecast_series.astype(np.float32)
     })
 
-    for key, val in futures_data.items():
-        df[key] = val
-
-    # Dividend forecasts time series (with noise)
-    df['DivForecast'] = div_yield_true + np.random.normal(0, div_noise_std, size=N+1)
-
-    # Save CSV
-    df.to_csv('/Users/sohailwaquee/Documents/delta one mispricing/data/mock_market_data.csv', index=False)
-    print('Mock market data saved to data/mock_market_data.csv')
+    # Save to data/ (Parquet by default, CSV when DATA_FORMAT is 'csv')
+    if save:
+        path = save_frame(df, 'mock_market_data')
+        print(f'Mock market data saved to {path}')
+    return df
 
 if __name__ == '__main__':
     generate_mock_data()
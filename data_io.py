@@ -0,0 +1,44 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+
+# Intermediate data lives next to the scripts, in data/
+DATA_DIR = Path(__file__).resolve().parent / 'data'
+
+# 'parquet' (typed, columnar) or 'csv' for tooling that expects plain text
+DATA_FORMAT = os.environ.get('DELTA_ONE_DATA_FORMAT', 'parquet')
+
+def data_path(name, fmt=None):
+    """
+    Path of the data file for a dataset name, e.g. 'mock_market_data'.
+    """
+    fmt = fmt or DATA_FORMAT
+    return DATA_DIR / f'{name}.{fmt}'
+
+def save_frame(df, name, fmt=None):
+    """
+    Save a DataFrame to data/<name>.<fmt> and return the path written.
+    """
+    fmt = fmt or DATA_FORMAT
+    path = data_path(name, fmt)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == 'parquet':
+        df.to_parquet(path, engine='pyarrow', compression='snappy', index=False)
+    elif fmt == 'csv':
+        df.to_csv(path, index=False)
+    else:
+        raise ValueError(f'Unsupported data format: {fmt}')
+    return path
+
+def load_frame(name, fmt=None):
+    """
+    Load data/<name>.<fmt> into a DataFrame.
+    """
+    fmt = fmt or DATA_FORMAT
+    path = data_path(name, fmt)
+    if fmt == 'parquet':
+        return pd.read_parquet(path, engine='pyarrow')
+    if fmt == 'csv':
+        return pd.read_csv(path)
+    raise ValueError(f'Unsupported data format: {fmt}')
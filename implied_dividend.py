@@ -1,24 +1,39 @@
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 
-def calculate_implied_dividend(spot, futures, r, T):
+from data_io import load_frame, save_frame
+from plotting import finish_figure
+
+def calculate_implied_dividend(spot, futures, r, T, out=None):
     """
     Calculate implied dividend yield q from spot and futures prices.
     
     Parameters:
         spot (float or np.array): spot price(s)
         futures (float or np.array): futures price(s)
-        r (float): risk-free rate (annual)
-        T (float): time to maturity (in years)
+        r (float or np.array): risk-free rate (annual)
+        T (float or np.array): time to maturity (in years)
+        out (np.array, optional): float64 buffer to write the result into,
+            reusable across calls
         
     Returns:
         implied dividend yield q (float or np.array)
     """
+    spot = np.asarray(spot, dtype=np.float64)
+    futures = np.asarray(futures, dtype=np.float64)
+    if out is None:
+        out = np.empty(np.broadcast_shapes(spot.shape, futures.shape,
+                                           np.shape(r), np.shape(T)))
+    # In-place ops: no temporaries for the ratio or its log.
     # To avoid division by zero or log of zero
     with np.errstate(divide='ignore', invalid='ignore'):
-        q = r - np.log(futures / spot) / T
-    return q
+        np.divide(futures, spot, out=out)
+        np.log(out, out=out)
+        out /= T
+        np.subtract(r, out, out=out)
+    if out.ndim == 0:
+        return out[()]
+    return out
 
 def detect_mispricing(df, maturity_days):
     """
@@ -33,45 +48,68 @@ def detect_mispricing(df, maturity_days):
           - 'ImpliedDiv_<maturity>d'
           - 'Mispricing_<maturity>d' (implied dividend - forecast dividend)
     """
-    T = maturity_days / 252  # Convert days to years (trading days)
-    implied_div_col = f'ImpliedDiv_{maturity_days}d'
-    mispricing_col = f'Mispricing_{maturity_days}d'
+    return detect_mispricing_all(df, [maturity_days])
+
+def detect_mispricing_all(df, maturities):
+    """
+    Detect mispricing for several futures maturities in one broadcasted pass.
+    
+    Args:
+        df (pd.DataFrame): DataFrame with columns ['Spot', 'RiskFreeRate', 'DivForecast']
+            and 'F_<maturity>d' for every maturity
+        maturities (list of int): Days to expiry of each future
+        
+    Returns:
+        df_extended (pd.DataFrame): Original df with 'ImpliedDiv_<maturity>d' and
+        'Mispricing_<maturity>d' columns for every maturity
+    """
+    T = np.asarray(maturities, dtype=np.float64) / 252  # (M,)
+
+    # Spot, rate and forecast are read once and broadcast across maturities
+    spot = df['Spot'].to_numpy(dtype=np.float64)[:, None]
+    fut = np.stack([df[f'F_{d}d'].to_numpy(dtype=np.float64) for d in maturities], axis=1)
+    r = df['RiskFreeRate'].to_numpy(dtype=np.float64)[:, None]
+    fcst = df['DivForecast'].to_numpy(dtype=np.float64)[:, None]
+
+    implied = calculate_implied_dividend(spot, fut, r, T[None, :])  # (N+1, M)
+    mispricing = implied - fcst
 
-    df[implied_div_col] = calculate_implied_dividend(df['Spot'], df[f'F_{maturity_days}d'], df['RiskFreeRate'], T)
-    df[mispricing_col] = df[implied_div_col] - df['DivForecast']
+    for k, d in enumerate(maturities):
+        df[f'ImpliedDiv_{d}d'] = implied[:, k].astype(np.float32)
+        df[f'Mispricing_{d}d'] = mispricing[:, k].astype(np.float32)
     
     return df
 
-def plot_implied_vs_forecast(df, maturity_days):
+def plot_implied_vs_forecast(df, maturity_days, path=None, show=False):
     implied_div_col = f'ImpliedDiv_{maturity_days}d'
     
-    plt.figure(figsize=(12,6))
-    plt.plot(df['Day'], df['DivForecast'], label='Forecast Dividend Yield', linestyle='--')
-    plt.plot(df['Day'], df[implied_div_col], label='Implied Dividend Yield', alpha=0.8)
-    plt.xlabel('Day')
-    plt.ylabel('Dividend Yield')
-    plt.title(f'Implied vs Forecast Dividend Yield ({maturity_days}d Futures)')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    fig, ax = plt.subplots(figsize=(12,6))
+    ax.plot(df['Day'], df['DivForecast'], label='Forecast Dividend Yield', linestyle='--')
+    ax.plot(df['Day'], df[implied_div_col], label='Implied Dividend Yield', alpha=0.8)
+    ax.set_xlabel('Day')
+    ax.set_ylabel('Dividend Yield')
+    ax.set_title(f'Implied vs Forecast Dividend Yield ({maturity_days}d Futures)')
+    ax.legend()
+    ax.grid(True)
+    return finish_figure(fig, path, show)
 
-def plot_mispricing(df, maturity_days):
+def plot_mispricing(df, maturity_days, path=None, show=False):
     mispricing_col = f'Mispricing_{maturity_days}d'
     
-    plt.figure(figsize=(12,6))
-    plt.plot(df['Day'], df[mispricing_col], label='Dividend Mispricing')
-    plt.axhline(0, color='red', linestyle='--')
-    plt.xlabel('Day')
-    plt.ylabel('Implied Dividend - Forecast Dividend')
-    plt.title(f'Dividend Mispricing Detection ({maturity_days}d Futures)')
-    plt.legend()
-    plt.grid(True)
-    plt.show()
+    fig, ax = plt.subplots(figsize=(12,6))
+    ax.plot(df['Day'], df[mispricing_col], label='Dividend Mispricing')
+    ax.axhline(0, color='red', linestyle='--')
+    ax.set_xlabel('Day')
+    ax.set_ylabel('Implied Dividend - Forecast Dividend')
+    ax.set_title(f'Dividend Mispricing Detection ({maturity_days}d Futures)')
+    ax.legend()
+    ax.grid(True)
+    return finish_figure(fig, path, show)
 
 
 if __name__ == '__main__':
     # Load the mock data generated on Day 1
-    df = pd.read_csv('/Users/sohailwaquee/Documents/delta one mispricing/data/mock_market_data.csv')
+    df = load_frame('mock_market_data')
     
     # Choose a maturity to analyze
     maturity = 20  # 20 days (1 month futures)
@@ -80,8 +118,8 @@ if __name__ == '__main__':
     df = detect_mispricing(df, maturity)
     
     # Plot results
-    plot_implied_vs_forecast(df, maturity)
-    plot_mispricing(df, maturity)
+    plot_implied_vs_forecast(df, maturity, show=True)
+    plot_mispricing(df, maturity, show=True)
 
-    df.to_csv('/Users/sohailwaquee/Documents/delta one mispricing/data/mock_market_data.csv', index=False)
+    save_frame(df, 'mock_market_data')
     print("Updated DataFrame with implied dividend and mispricing saved.")
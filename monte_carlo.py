@@ -0,0 +1,63 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import matplotlib
+matplotlib.use('Agg')  # Workers never plot; keep them headless
+import numpy as np
+import pandas as pd
+
+from data_generator import generate_mock_data
+from implied_dividend import detect_mispricing
+from trade_simulator import generate_trade_signals, simulate_pnl, summarize_pnl
+
+def run_one_sim(seed_seq, maturity_days=20, entry_threshold=0.005, hold_period=5):
+    """
+    Run the full pipeline in memory for one random stream.
+
+    Args:
+        seed_seq (np.random.SeedSequence): Independent stream for this run
+        maturity_days (int): Futures maturity to trade
+        entry_threshold (float): Mispricing threshold for entering trades
+        hold_period (int): How many days each position is held
+
+    Returns:
+        dict of PnL summary statistics
+    """
+    rng = np.random.default_rng(seed_seq)
+    df = generate_mock_data(rng=rng, save=False)
+    df = detect_mispricing(df, maturity_days)
+    df = generate_trade_signals(df, maturity_days, entry_threshold=entry_threshold)
+    df = simulate_pnl(df, maturity_days, hold_period=hold_period)
+    return summarize_pnl(df, maturity_days)
+
+def run_simulations(n_sims, seed=42, max_workers=None, **sim_kwargs):
+    """
+    Run n_sims independent pipeline simulations across CPU cores.
+
+    Args:
+        n_sims (int): Number of simulations
+        seed (int): Root seed; each run gets its own spawned stream
+        max_workers (int): Worker processes (defaults to the CPU count)
+        **sim_kwargs: Passed through to run_one_sim
+
+    Returns:
+        DataFrame with one row of summary statistics per simulation
+    """
+    seed_seqs = np.random.SeedSequence(seed).spawn(n_sims)
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, n_sims // (4 * workers))
+
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        results = list(ex.map(partial(run_one_sim, **sim_kwargs), seed_seqs,
+                              chunksize=chunksize))
+
+    summary = pd.DataFrame(results)
+    summary.index.name = 'Sim'
+    return summary
+
+
+if __name__ == '__main__':
+    summary = run_simulations(200, seed=42)
+    print("Monte Carlo PnL Summary (200 simulations):")
+    print(summary.describe())
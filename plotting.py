@@ -0,0 +1,21 @@
+import matplotlib.pyplot as plt
+
+def finish_figure(fig, path=None, show=False):
+    """
+    Save and/or show a figure, then close it so pyplot doesn't retain it.
+
+    Args:
+        fig (Figure): Figure to finish
+        path (str or Path): Where to save the figure, if given
+        show (bool): Display the figure. Has no effect on non-interactive
+            backends such as Agg, where matplotlib only warns.
+
+    Returns:
+        The closed Figure, still usable for fig.savefig
+    """
+    if path is not None:
+        fig.savefig(path)
+    if show:
+        plt.show()
+    plt.close(fig)
+    return fig
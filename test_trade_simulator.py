@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import trade_simulator
+from trade_simulator import _simulate_pnl_kernel_py, simulate_pnl
+
+@pytest.mark.parametrize('hold', [0, 2, 10])
+def test_jit_kernel_matches_numpy_fallback(hold):
+    pytest.importorskip('numba')
+    signal = np.array([1, 0, -1, 1, 0, -1], dtype=np.int8)
+    future = np.array([100.0, 101.5, 99.0, 102.0, 98.5, 100.5], dtype=np.float32)
+
+    expected = _simulate_pnl_kernel_py(signal, future, hold, np.zeros(signal.size, dtype=np.float32))
+    result = trade_simulator._simulate_pnl_kernel(signal, future, hold, np.zeros(signal.size, dtype=np.float32))
+
+    np.testing.assert_array_equal(result, expected)
+
+def test_simulate_pnl_rejects_negative_hold():
+    df = pd.DataFrame({'Signal_20d': np.array([1, 0, -1], dtype=np.int8),
+                       'F_20d': np.array([100.0, 101.0, 102.0], dtype=np.float32)})
+    with pytest.raises(ValueError):
+        simulate_pnl(df, 20, hold_period=-1)
@@ -1,6 +1,36 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from data_io import load_frame, save_frame
+from plotting import finish_figure
+
+try:
+    from numba import njit
+except ImportError:  # Numba is optional
+    njit = None
+
+def _simulate_pnl_kernel_py(signal, future, hold, out):
+    # Entry on day i, PnL realized at exit day i + hold
+    n = max(signal.size - hold, 0)
+    entry_sig = signal[:n]
+    active = entry_sig != 0
+    exit_pnl = out[hold:hold + n]
+    exit_pnl[active] = entry_sig[active] * (future[hold:hold + n][active] - future[:n][active])
+    return out
+
+if njit is not None:
+    @njit(cache=True)
+    def _simulate_pnl_kernel(signal, future, hold, out):
+        # Scalar loop so path-dependent exits (stops, margin calls) slot in here
+        for i in range(signal.size - hold):
+            s = signal[i]
+            if s != 0:
+                out[i + hold] = s * (future[i + hold] - future[i])
+        return out
+else:
+    _simulate_pnl_kernel = _simulate_pnl_kernel_py
+
 def generate_trade_signals(df, maturity_days, entry_threshold=0.005):
     """
     Generate long/short futures signals based on dividend mispricing.
@@ -19,96 +49,119 @@ def generate_trade_signals(df, maturity_days, entry_threshold=0.005):
     mispricing_col = f'Mispricing_{maturity_days}d'
     signal_col = f'Signal_{maturity_days}d'
 
-    df[signal_col] = 0
-    df.loc[df[mispricing_col] > entry_threshold, signal_col] = -1  # short future
-    df.loc[df[mispricing_col] < -entry_threshold, signal_col] = +1  # long future
+    m = df[mispricing_col].to_numpy()
+    # -1 = short future (div overpriced), +1 = long future (div underpriced)
+    df[signal_col] = np.where(m > entry_threshold, -1,
+                              np.where(m < -entry_threshold, 1, 0)).astype(np.int8)
     
     return df
 
-def simulate_pnl(df, maturity_days, hold_period=5):
+def simulate_pnl(df, maturity_days, hold_period=5, return_positions=False):
     """
     Simulate PnL for each signal assuming constant holding period.
     
     Args:
         df (DataFrame): Should already have 'Signal' column.
         maturity_days (int): Futures maturity.
-        hold_period (int): How many days we hold the position.
+        hold_period (int): How many days we hold the position (>= 0).
+        return_positions (bool): Also return the individual trades.
 
     Returns:
-        DataFrame with PnL columns added.
+        DataFrame with PnL columns added, plus (if return_positions) a
+        DataFrame of trades with columns
+        ['EntryDay', 'Signal', 'EntryPrice', 'ExitPrice', 'PnL'].
     """
     signal_col = f'Signal_{maturity_days}d'
     future_col = f'F_{maturity_days}d'
     pnl_col = f'PnL_{maturity_days}d'
+    # The kernels index future[i + hold] unchecked, so reject negative holds
+    if hold_period < 0:
+        raise ValueError(f'hold_period must be non-negative, got {hold_period}')
     
-    df[pnl_col] = 0.0
-    positions = []
-
-    for i in range(len(df) - hold_period):
-        signal = df.at[i, signal_col]
-        if signal != 0:
-            entry_price = df.at[i, future_col]
-            exit_price = df.at[i + hold_period, future_col]
-            pnl = signal * (exit_price - entry_price)
-            df.at[i + hold_period, pnl_col] = pnl  # PnL realized at exit day
-            positions.append((i, signal, entry_price, exit_price, pnl))
+    sig = np.ascontiguousarray(df[signal_col].to_numpy())
+    fut = np.ascontiguousarray(df[future_col].to_numpy())
+
+    pnl = np.zeros(len(df), dtype=np.float32)
+    _simulate_pnl_kernel(sig, fut, hold_period, pnl)
+    df[pnl_col] = pnl
+
+    if not return_positions:
+        return df
+
+    # Built from the arrays only on request, never in the hot path
+    idx = np.flatnonzero(sig[:max(len(df) - hold_period, 0)])
+    exit_idx = idx + hold_period
+    positions = pd.DataFrame({
+        'EntryDay': idx,
+        'Signal': sig[idx],
+        'EntryPrice': fut[idx],
+        'ExitPrice': fut[exit_idx],
+        'PnL': pnl[exit_idx]
+    })
     
     return df, positions
 
 def summarize_pnl(df, maturity_days):
     pnl_col = f'PnL_{maturity_days}d'
-    realized_pnl = df[pnl_col][df[pnl_col] != 0]
+    arr = df[pnl_col].to_numpy()
+    realized = arr[arr != 0]
+    n = realized.size
+    total = realized.sum(dtype=np.float64)  # PnL is stored as float32
+    wins = np.count_nonzero(realized > 0)
     summary = {
-        'Total PnL': realized_pnl.sum(),
-        'Average PnL per trade': realized_pnl.mean(),
-        'Number of trades': len(realized_pnl),
-        'Hit ratio': (realized_pnl > 0).sum() / len(realized_pnl) if len(realized_pnl) else 0
+        'Total PnL': total,
+        'Average PnL per trade': total / n if n else 0.0,
+        'Number of trades': n,
+        'Hit ratio': wins / n if n else 0.0
     }
     return summary
 
-def plot_cumulative_pnl(df, maturity_days):
-    pnl_col = f'PnL_{maturity_days}d'
-    df['CumulativePnL'] = df[pnl_col].cumsum()
-
-    plt.figure(figsize=(12,6))
-    plt.plot(df['Day'], df['CumulativePnL'], label='Cumulative PnL', color='blue')
-    plt.axhline(0, color='black', linestyle='--')
-    plt.title(f'Cumulative PnL Curve ({maturity_days}d Futures)')
-    plt.xlabel('Day')
-    plt.ylabel('PnL')
-    plt.grid(True)
-    plt.legend()
-    plt.show()
-
-def plot_drawdown(df, maturity_days):
-    cumulative = df[f'PnL_{maturity_days}d'].cumsum()
+def plot_cumulative_pnl(df, maturity_days, cumulative=None, path=None, show=False):
+    # Pass a precomputed cumulative PnL to share one cumsum with plot_drawdown
+    if cumulative is None:
+        cumulative = df[f'PnL_{maturity_days}d'].cumsum()
+
+    fig, ax = plt.subplots(figsize=(12,6))
+    ax.plot(df['Day'], cumulative, label='Cumulative PnL', color='blue')
+    ax.axhline(0, color='black', linestyle='--')
+    ax.set_title(f'Cumulative PnL Curve ({maturity_days}d Futures)')
+    ax.set_xlabel('Day')
+    ax.set_ylabel('PnL')
+    ax.grid(True)
+    ax.legend()
+    return finish_figure(fig, path, show)
+
+def plot_drawdown(df, maturity_days, cumulative=None, path=None, show=False):
+    if cumulative is None:
+        cumulative = df[f'PnL_{maturity_days}d'].cumsum()
     rolling_max = cumulative.cummax()
     drawdown = cumulative - rolling_max
 
-    plt.figure(figsize=(12,6))
-    plt.plot(df['Day'], drawdown, label='Drawdown', color='red')
-    plt.title(f'Drawdown Curve ({maturity_days}d Futures)')
-    plt.xlabel('Day')
-    plt.ylabel('Drawdown')
-    plt.grid(True)
-    plt.legend()
-    plt.show()
+    fig, ax = plt.subplots(figsize=(12,6))
+    ax.plot(df['Day'], drawdown, label='Drawdown', color='red')
+    ax.set_title(f'Drawdown Curve ({maturity_days}d Futures)')
+    ax.set_xlabel('Day')
+    ax.set_ylabel('Drawdown')
+    ax.grid(True)
+    ax.legend()
+    return finish_figure(fig, path, show)
 
 
 if __name__ == '__main__':
     # Load data with mispricing
-    df = pd.read_csv('/Users/sohailwaquee/Documents/delta one mispricing/data/mock_market_data.csv')
+    df = load_frame('mock_market_data')
     
     maturity = 20
     df = generate_trade_signals(df, maturity, entry_threshold=0.005)
-    df, trades = simulate_pnl(df, maturity, hold_period=5)
+    df = simulate_pnl(df, maturity, hold_period=5)
     
     summary = summarize_pnl(df, maturity)
     print("PnL Summary:")
     for k, v in summary.items():
         print(f"{k}: {v:.4f}")
     
-    df.to_csv(f'/Users/sohailwaquee/Documents/delta one mispricing/data/trade_sim_results_{maturity}d.csv', index=False)
+    save_frame(df, f'trade_sim_results_{maturity}d')
     
-    plot_cumulative_pnl(df, maturity)
-    plot_drawdown(df, maturity)
+    cumulative = df[f'PnL_{maturity}d'].cumsum()
+    plot_cumulative_pnl(df, maturity, cumulative=cumulative, show=True)
+    plot_drawdown(df, maturity, cumulative=cumulative, show=True)